@@ -1,193 +1,60 @@
+import struct
+from array import array
+
+# Big-endian 32-bit word codec shared by the cache read/write paths
+_U32 = struct.Struct('>I')
+
 class CacheError(Exception):
     """Custom exception for cache errors."""
     pass
 
-class CacheLine:
-    def __init__(self):
-        self.valid = False
-        self.tag = None
-        self.data = None
-        self.last_accessed = 0
-
-class Cache:
-    def __init__(self, memory_bus, cache_size=1024, line_size=32):
-        """
-        Initialize the cache with specified parameters.
-        
-        Args:
-            memory_bus: Reference to the memory bus for data access
-            cache_size: Total cache size in bytes (default 1024)
-            line_size: Cache line size in bytes (default 32)
-        """
-        self.memory_bus = memory_bus
-        self.enabled = True
-        self.access_count = 0
-        
-        # Cache configuration
-        self.cache_size = cache_size
-        self.line_size = line_size
-        self.num_lines = cache_size // line_size
-        
-        # Calculate address bit fields
-        self.offset_bits = self._log2(line_size)
-        self.index_bits = self._log2(self.num_lines)
-        self.tag_bits = 32 - (self.offset_bits + self.index_bits)
-        
-        # Initialize cache lines
-        self.lines = [CacheLine() for _ in range(self.num_lines)]
-        
-        # Statistics
-        self.hits = 0
-        self.misses = 0
-    
-    def read(self, address):
-        """
-        Read data from cache.
-        
-        Args:
-            address: Memory address to read from
-            
-        Returns:
-            Data at the specified address
-        """
-        if not self.enabled:
-            return self.memory_bus.read(address)
-            
-        self.access_count += 1
-        
-        # Extract address fields
-        offset = address & ((1 << self.offset_bits) - 1)
-        index = (address >> self.offset_bits) & ((1 << self.index_bits) - 1)
-        tag = address >> (self.offset_bits + self.index_bits)
-        
-        cache_line = self.lines[index]
-        
-        # Cache hit
-        if cache_line.valid and cache_line.tag == tag:
-            self.hits += 1
-            cache_line.last_accessed = self.access_count
-            return cache_line.data[offset:offset + 4]  # Return 4 bytes (word)
-            
-        # Cache miss
-        self.misses += 1
-        
-        # Read entire cache line from memory
-        line_address = address & ~((1 << self.offset_bits) - 1)
-        data = []
-        for i in range(self.line_size):
-            data.append(self.memory_bus.read(line_address + i))
-            
-        # Update cache line
-        cache_line.valid = True
-        cache_line.tag = tag
-        cache_line.data = data
-        cache_line.last_accessed = self.access_count
-        
-        return cache_line.data[offset:offset + 4]  # Return requested word
-    
-    def write(self, address, data):
-        """
-        Write data to cache (write-through policy).
-        
-        Args:
-            address: Memory address to write to
-            data: Data to write
-        """
-        if not self.enabled:
-            self.memory_bus.write(address, data)
-            return
-            
-        self.access_count += 1
-        
-        # Extract address fields
-        offset = address & ((1 << self.offset_bits) - 1)
-        index = (address >> self.offset_bits) & ((1 << self.index_bits) - 1)
-        tag = address >> (self.offset_bits + self.index_bits)
-        
-        cache_line = self.lines[index]
-        
-        # Update memory (write-through)
-        self.memory_bus.write(address, data)
-        
-        # Update cache if it's a hit
-        if cache_line.valid and cache_line.tag == tag:
-            self.hits += 1
-            cache_line.data[offset:offset + 4] = data
-            cache_line.last_accessed = self.access_count
-        else:
-            self.misses += 1
-            # On write miss, we could either allocate or not (write-no-allocate)
-            # Here we implement write-no-allocate for simplicity
-    
-    def flush(self):
-        """Flush the entire cache."""
-        for line in self.lines:
-            line.valid = False
-            line.tag = None
-            line.data = None
-        self.hits = 0
-        self.misses = 0
-        self.access_count = 0
-    
-    def toggle(self, status):
-        """Enable or disable the cache."""
-        self.enabled = status
-        if not status:
-            self.flush()
-    
-    def get_stats(self):
-        """
-        Get cache performance statistics.
-        
-        Returns:
-            Dictionary containing hit rate and miss rate
-        """
-        total_accesses = self.hits + self.misses
-        if total_accesses == 0:
-            return {'hit_rate': 0, 'miss_rate': 0}
-            
-        hit_rate = self.hits / total_accesses
-        miss_rate = self.misses / total_accesses
-        
-        return {
-            'hit_rate': hit_rate,
-            'miss_rate': miss_rate,
-            'total_accesses': total_accesses,
-            'hits': self.hits,
-            'misses': self.misses
-        }
-    
-    @staticmethod
-    def _log2(x):
-        """Calculate the log base 2 of a number (for bit field calculations)."""
-        n = 0
-        while x > 1:
-            x >>= 1
-            n += 1
-        return n
-
 class Cache:
     """Direct-mapped cache implementation."""
     
-    def __init__(self, memory_bus, size=1024):
+    def __init__(self, memory_bus, size=1024, prefetch_enabled=True, prefetch_degree=1):
         """
         Initialize the cache.
         
         Args:
             memory_bus: Reference to the memory bus
             size: Cache size in bytes (default 1KB)
+            prefetch_enabled: Prefetch on sequential or constant-stride misses (default True)
+            prefetch_degree: Number of lines/strides to prefetch ahead (default 1)
         """
         self.memory_bus = memory_bus
+        self.enabled = True
+        self._io_start = memory_bus.IO_BASE  # Start of the uncached I/O space
+        self._bypass_start = self._io_start  # Accesses at or above go straight to the bus
+        self._memory_size = memory_bus.MEMORY_SIZE
         self.size = size
         self.line_size = 32  # 32-byte cache lines
         self.num_lines = size // self.line_size
-        
-        # Cache storage: each entry is (valid, tag, data)
-        self.lines = [(False, 0, bytearray(self.line_size)) for _ in range(self.num_lines)]
+        if self.num_lines <= 0 or self.num_lines & (self.num_lines - 1):
+            raise CacheError(f"Cache size must be a power-of-two multiple of {self.line_size} bytes")
+        
+        # Address decomposition: offset, index and tag fields are split with
+        # shifts and masks, both line size and line count being powers of two
+        self._offset_mask = self.line_size - 1
+        self._index_shift = self.line_size.bit_length() - 1
+        self._index_mask = self.num_lines - 1
+        self._tag_shift = self._index_shift + self.num_lines.bit_length() - 1
+        self.prefetch_enabled = prefetch_enabled
+        self.prefetch_degree = prefetch_degree
+        
+        # Cache storage: parallel valid flags, tags and per-line data buffers
+        self._valid = bytearray(self.num_lines)
+        self._tags = array('I', [0]) * self.num_lines
+        self._data = [bytearray(self.line_size) for _ in range(self.num_lines)]
+        self._prefetched = bytearray(self.num_lines)  # Filled by prefetch, not yet used
+        
+        # Stride detector state
+        self._last_miss_addr = -1
+        self._last_stride = 0
         
         # Statistics
         self.hits = 0
         self.misses = 0
+        self._prefetch_hits = 0
     
     def read_word(self, address):
         """
@@ -199,46 +66,95 @@ class Cache:
         Returns:
             32-bit word value
         """
-        # Handle I/O space directly through memory bus
-        if address >= self.memory_bus.IO_START:
+        # Handle I/O space (or every access while disabled) through memory bus
+        if address >= self._bypass_start:
             return self.memory_bus.read_word(address)
         
         # Calculate cache line index and tag
-        line_index = (address // self.line_size) % self.num_lines
-        tag = address // (self.line_size * self.num_lines)
-        offset = address % self.line_size
+        line_index = (address >> self._index_shift) & self._index_mask
+        tag = address >> self._tag_shift
+        offset = address & self._offset_mask
         
         # Check for cache hit
-        valid, line_tag, data = self.lines[line_index]
-        if valid and line_tag == tag:
+        data = self._data[line_index]
+        if self._valid[line_index] and self._tags[line_index] == tag:
             self.hits += 1
-            return int.from_bytes(data[offset:offset + 4], byteorder='big')
+            if self._prefetched[line_index]:
+                self._prefetch_hits += 1
+                self._prefetched[line_index] = 0
+            return _U32.unpack_from(data, offset)[0]
         
         # Cache miss: load line from memory
         self.misses += 1
-        line_addr = (address // self.line_size) * self.line_size
+        line_addr = address - offset
         
-        # Read entire cache line from memory
-        for i in range(0, self.line_size, 4):
-            word = self.memory_bus.read_word(line_addr + i)
-            data[i:i + 4] = word.to_bytes(4, byteorder='big')
+        # Copy the entire cache line straight out of the bus's memory
+        if line_addr + self.line_size > self._memory_size:
+            raise MemoryError(f"Memory read out of bounds: {hex(address)}")
+        data[:] = self.memory_bus.as_bytes_view()[line_addr:line_addr + self.line_size]
         
         # Update cache line
-        self.lines[line_index] = (True, tag, data)
+        self._valid[line_index] = 1
+        self._tags[line_index] = tag
+        self._prefetched[line_index] = 0
+        
+        if self.prefetch_enabled:
+            # Next-line prefetch: a miss right after the preceding line was
+            # brought in indicates a sequential stream, so fetch ahead of it
+            prev_addr = line_addr - self.line_size
+            prev_index = (line_index - 1) & self._index_mask
+            if (prev_addr >= 0 and self._valid[prev_index]
+                    and self._tags[prev_index] == prev_addr >> self._tag_shift):
+                for i in range(1, self.prefetch_degree + 1):
+                    self._prefetch_line(line_addr + i * self.line_size)
+            else:
+                # Stride prefetch: two consecutive misses the same distance
+                # apart (e.g. an LW loop over an array) predict the next ones
+                stride = address - self._last_miss_addr
+                stream_addr = address
+                if stride != 0 and stride == self._last_stride:
+                    for i in range(1, self.prefetch_degree + 1):
+                        stream_addr = address + i * stride
+                        self._prefetch_line(stream_addr & ~self._offset_mask)
+                self._last_stride = stride
+                # Continue the stream from the last prefetched element so
+                # the next miss along it still matches the stride
+                self._last_miss_addr = stream_addr
         
         # Return requested word
-        return int.from_bytes(data[offset:offset + 4], byteorder='big')
+        return _U32.unpack_from(data, offset)[0]
+    
+    def _prefetch_line(self, line_addr):
+        """
+        Bring a line into the cache ahead of a demand access.
+        
+        Args:
+            line_addr: Line-aligned memory address to prefetch
+        """
+        if (line_addr < 0 or line_addr + self.line_size > self._memory_size
+                or line_addr >= self._io_start):
+            return
+        
+        line_index = (line_addr >> self._index_shift) & self._index_mask
+        tag = line_addr >> self._tag_shift
+        if self._valid[line_index] and self._tags[line_index] == tag:
+            return
+        
+        self._data[line_index][:] = self.memory_bus.as_bytes_view()[line_addr:line_addr + self.line_size]
+        self._valid[line_index] = 1
+        self._tags[line_index] = tag
+        self._prefetched[line_index] = 1
     
     def write_word(self, address, value):
         """
-        Write a word to cache and memory (write-through).
+        Write a word to cache and memory (write-through, write-allocate).
         
         Args:
             address: Memory address to write to
             value: 32-bit word value to write
         """
-        # Handle I/O space directly through memory bus
-        if address >= self.memory_bus.IO_START:
+        # Handle I/O space (or every access while disabled) through memory bus
+        if address >= self._bypass_start:
             self.memory_bus.write_word(address, value)
             return
         
@@ -246,20 +162,23 @@ class Cache:
         self.memory_bus.write_word(address, value)
         
         # Calculate cache line index and tag
-        line_index = (address // self.line_size) % self.num_lines
-        tag = address // (self.line_size * self.num_lines)
-        offset = address % self.line_size
+        line_index = (address >> self._index_shift) & self._index_mask
+        tag = address >> self._tag_shift
+        offset = address & self._offset_mask
         
-        # Check for cache hit
-        valid, line_tag, data = self.lines[line_index]
-        if valid and line_tag == tag:
+        # Either way the line ends up valid and holding the written word
+        if self._valid[line_index] and self._tags[line_index] == tag:
             self.hits += 1
-            # Update cache line
-            data[offset:offset + 4] = value.to_bytes(4, byteorder='big')
-            self.lines[line_index] = (True, tag, data)
+            _U32.pack_into(self._data[line_index], offset, value)
         else:
-            # Cache miss: write-no-allocate policy
+            # Allocate on miss: memory already holds the new word, so copying
+            # the whole line keeps its other words coherent
             self.misses += 1
+            line_addr = address - offset
+            self._data[line_index][:] = self.memory_bus.as_bytes_view()[line_addr:line_addr + self.line_size]
+            self._valid[line_index] = 1
+            self._tags[line_index] = tag
+            self._prefetched[line_index] = 0
     
     def invalidate(self, address=None):
         """
@@ -270,12 +189,32 @@ class Cache:
         """
         if address is None:
             # Invalidate entire cache
-            for i in range(self.num_lines):
-                self.lines[i] = (False, 0, bytearray(self.line_size))
+            self._valid[:] = bytes(self.num_lines)
+            self._prefetched[:] = bytes(self.num_lines)
         else:
-            # Invalidate specific line
-            line_index = (address // self.line_size) % self.num_lines
-            self.lines[line_index] = (False, 0, bytearray(self.line_size))
+            # Invalidate specific line, only if it currently holds this address
+            line_index = (address >> self._index_shift) & self._index_mask
+            if self._tags[line_index] == address >> self._tag_shift:
+                self._valid[line_index] = 0
+                self._prefetched[line_index] = 0
+    
+    def flush(self):
+        """Flush the entire cache and reset its statistics."""
+        self.invalidate()
+        self.hits = 0
+        self.misses = 0
+        self._prefetch_hits = 0
+        self._last_miss_addr = -1
+        self._last_stride = 0
+    
+    def toggle(self, status):
+        """Enable or disable the cache."""
+        self.enabled = status
+        # A disabled cache forwards every address to the bus, which lets the
+        # hot path keep a single bypass comparison
+        self._bypass_start = self._io_start if status else 0
+        if not status:
+            self.flush()
     
     def get_hits(self):
         """Get the number of cache hits."""
@@ -289,3 +228,18 @@ class Cache:
         """Get the cache hit rate."""
         total = self.hits + self.misses
         return (self.hits / total) if total > 0 else 0.0
+    
+    def get_stats(self):
+        """
+        Get cache performance statistics.
+        
+        Returns:
+            Dictionary containing hit/miss counts, hit rate and the number
+            of demand hits served by prefetched lines
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.get_hit_rate(),
+            'prefetch_hits': self._prefetch_hits
+        }
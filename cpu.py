@@ -1,22 +1,69 @@
-from instruction_set import InstructionSet
+from array import array
+from collections import namedtuple
+from cache import Cache
+
+# Decoded instruction fields; fields not used by a format are None
+Decoded = namedtuple('Decoded',
+                     'opcode rs rt rd shamt funct immediate target branch_offset jump_target',
+                     defaults=(None,) * 9)
+
+def _to_signed(value):
+    """Interpret a 32-bit register value as a two's complement integer."""
+    return value - ((value & 0x80000000) << 1)
 
 class CPU:
     """CPU for MIPS simulator."""
     
-    def __init__(self, memory_bus, instruction_set):
-        """Initialize CPU."""
+    def __init__(self, memory_bus, instruction_set=None, trace=False, icache=None):
+        """Initialize CPU.
+        
+        Args:
+            memory_bus: Memory bus used for data access
+            instruction_set: Ignored (default None); the executors implement
+                each instruction directly. Kept so callers that still pass an
+                InstructionSet keep working
+            trace: Print a line for every executed instruction (default False)
+            icache: Instruction cache used for fetches (default: a Cache
+                wrapping memory_bus)
+        """
         self.memory_bus = memory_bus
-        self.instruction_set = instruction_set
+        self.trace = trace
+        
+        # Bound once so memory instructions skip the attribute chains
+        self._memory_size = memory_bus.MEMORY_SIZE
+        self._mem_read = memory_bus.read_word
+        self._mem_write = memory_bus.write_word
+        self.icache = icache if icache is not None else Cache(memory_bus)
+        
+        # Dispatch tables indexed by opcode and, for R-type, by funct
+        self._op_table = [self._execute_invalid] * 64
+        self._op_table[0x08] = self._execute_addi
+        self._op_table[0x23] = self._execute_lw
+        self._op_table[0x2B] = self._execute_sw
+        self._op_table[0x05] = self._execute_bne
+        self._op_table[0x04] = self._execute_beq
+        self._op_table[0x02] = self._execute_j
+        self._op_table[0x03] = self._execute_jal
+        self._op_table[0x3F] = self._execute_halt
+        
+        self._r_table = [self._execute_nop] * 64
+        self._r_table[0x20] = self._execute_add
+        self._r_table[0x22] = self._execute_sub
+        self._r_table[0x2A] = self._execute_slt
         self.reset()
         
     def reset(self):
         """Reset CPU state."""
         self.pc = 0  # Program counter
-        self.registers = [0] * 32  # 32 general-purpose registers
+        self.registers = array('I', [0] * 32)  # 32 general-purpose registers (uint32)
         self.halted = False
         self.branch_taken = False
         self.branch_target = None
         
+        # Decoded instructions keyed by PC: (instruction, handler, decoded)
+        self._decode_cache = {}
+        self.icache.invalidate()
+        
         # Initialize special registers
         self.registers[0] = 0  # $zero is always 0
         self.registers[29] = 0x7FFFFFFF  # $sp (stack pointer)
@@ -25,38 +72,51 @@ class CPU:
         
     def run(self):
         """Run the CPU until halted."""
+        # Bind loop-invariant lookups to locals so each cycle skips
+        # repeated attribute resolution
+        read_word = self.icache.read_word
+        decode_cache = self._decode_cache
+        update_pc = self.update_pc
+        
         while not self.halted:
             try:
                 # Fetch instruction
-                instruction = self.memory_bus.read_word(self.pc)
+                pc = self.pc
+                instruction = read_word(pc)
                 
-                # Decode instruction
-                decoded = self.decode_instruction(instruction)
+                # Decode instruction, reusing the cached decode when the
+                # word at this PC is unchanged since it was last decoded
+                entry = decode_cache.get(pc)
+                if entry is None or entry[0] != instruction:
+                    entry = self._decode_entry(instruction, pc)
+                    decode_cache[pc] = entry
                 
                 # Execute instruction
-                if decoded['opcode'] == 0x00:  # R-type
-                    self._execute_r_type(decoded)
-                elif decoded['opcode'] in [0x08, 0x23, 0x2B, 0x05, 0x04]:  # I-type
-                    self._execute_i_type(decoded)
-                elif decoded['opcode'] in [0x02, 0x03]:  # J-type
-                    self._execute_j_type(decoded)
-                elif decoded['opcode'] == 0x3F:  # HALT
-                    print("\nCPU halted")
-                    self.halted = True
+                entry[1](entry[2])
+                if self.halted:
                     break
-                else:
-                    raise ValueError(f"Unknown opcode: {hex(decoded['opcode'])}")
                 
                 # Update program counter
-                self.update_pc()
+                update_pc()
                 
             except Exception as e:
                 print(f"\nError during execution at PC={hex(self.pc)}: {str(e)}")
                 self.halted = True
                 break
                 
-    def decode_instruction(self, instruction: int) -> dict:
-        """Decode a 32-bit instruction."""
+    def _decode_entry(self, instruction: int, pc: int) -> tuple:
+        """Decode an instruction fetched from pc and pair it with its executor."""
+        decoded = self.decode_instruction(instruction, pc)
+        return (instruction, self._lookup_handler(decoded), decoded)
+    
+    def _lookup_handler(self, decoded_instr):
+        """Select the executor for a decoded instruction."""
+        if decoded_instr.opcode == 0x00:  # R-type
+            return self._r_table[decoded_instr.funct]
+        return self._op_table[decoded_instr.opcode]
+    
+    def decode_instruction(self, instruction: int, pc: int = None) -> Decoded:
+        """Decode a 32-bit instruction fetched from pc (default: current PC)."""
         opcode = (instruction >> 26) & 0x3F
         
         if opcode == 0x00:  # R-type
@@ -65,14 +125,7 @@ class CPU:
             rd = (instruction >> 11) & 0x1F
             shamt = (instruction >> 6) & 0x1F
             funct = instruction & 0x3F
-            return {
-                'opcode': opcode,
-                'rs': rs,
-                'rt': rt,
-                'rd': rd,
-                'shamt': shamt,
-                'funct': funct
-            }
+            return Decoded(opcode, rs, rt, rd, shamt, funct)
         elif opcode in [0x08, 0x23, 0x2B, 0x05, 0x04]:  # I-type
             rs = (instruction >> 21) & 0x1F
             rt = (instruction >> 16) & 0x1F
@@ -80,140 +133,148 @@ class CPU:
             # Sign extend immediate if needed
             if immediate & 0x8000:
                 immediate |= -1 << 16
-            return {
-                'opcode': opcode,
-                'rs': rs,
-                'rt': rt,
-                'immediate': immediate
-            }
+            # Branch displacement in bytes, precomputed so executing a
+            # cached branch needs no further shifting
+            return Decoded(opcode, rs, rt, immediate=immediate,
+                           branch_offset=immediate << 2)
         elif opcode in [0x02, 0x03]:  # J-type
             target = instruction & 0x3FFFFFF
-            return {
-                'opcode': opcode,
-                'target': target
-            }
+            if pc is None:
+                pc = self.pc
+            # Jump target is in the 256MB region of the jump itself, so the
+            # absolute address is fixed once the fetch PC is known
+            jump_target = (pc & 0xF0000000) | (target << 2)
+            return Decoded(opcode, target=target, jump_target=jump_target)
         elif opcode == 0x3F:  # HALT
-            return {
-                'opcode': opcode
-            }
+            return Decoded(opcode)
         else:
             raise ValueError(f"Unknown opcode: {hex(opcode)}")
             
     def execute_instruction(self, decoded_instr):
         """Execute a decoded instruction."""
-        if decoded_instr['opcode'] == 0x00:  # R-type
-            self._execute_r_type(decoded_instr)
-        elif decoded_instr['opcode'] in [0x08, 0x23, 0x2B, 0x05, 0x04]:  # I-type
-            self._execute_i_type(decoded_instr)
-        elif decoded_instr['opcode'] in [0x02, 0x03]:  # J-type
-            self._execute_j_type(decoded_instr)
-        elif decoded_instr['opcode'] == 0x3F:  # HALT
-            print("\nCPU halted")
-            self.halted = True
-            
-    def _execute_r_type(self, decoded_instr):
-        """Execute R-type instruction."""
-        funct = decoded_instr['funct']
-        rs = self.registers[decoded_instr['rs']]
-        rt = self.registers[decoded_instr['rt']]
-        rd_idx = decoded_instr['rd']
-        
-        if funct == 0x20:  # ADD
-            self.registers[rd_idx] = self.instruction_set.add(rd_idx, rs, rt)
-            print(f"ADD: r{rd_idx} = {hex(self.registers[rd_idx])} (r{decoded_instr['rs']} + r{decoded_instr['rt']})")
-        elif funct == 0x22:  # SUB
-            self.registers[rd_idx] = self.instruction_set.sub(rd_idx, rs, rt)
-            print(f"SUB: r{rd_idx} = {hex(self.registers[rd_idx])} (r{decoded_instr['rs']} - r{decoded_instr['rt']})")
-        elif funct == 0x2A:  # SLT
-            self.registers[rd_idx] = self.instruction_set.slt(rd_idx, rs, rt)
-            print(f"SLT: r{rd_idx} = {hex(self.registers[rd_idx])} (r{decoded_instr['rs']} < r{decoded_instr['rt']})")
-            
-        # Ensure R0 stays 0
-        self.registers[0] = 0
-    
-    def _execute_i_type(self, decoded_instr):
-        """Execute I-type instruction."""
-        opcode = decoded_instr['opcode']
-        rs = self.registers[decoded_instr['rs']]
-        rt_idx = decoded_instr['rt']
-        immediate = decoded_instr['immediate']
-        
-        # Sign extend immediate for arithmetic operations
-        if opcode in [0x08, 0x23, 0x2B]:  # ADDI, LW, SW
-            if immediate & 0x8000:
-                immediate |= -1 << 16
-        
-        if opcode == 0x08:  # ADDI
-            result = rs + immediate
-            self.registers[rt_idx] = result & 0xFFFFFFFF
-            print(f"ADDI: r{rt_idx} = {hex(self.registers[rt_idx])} (r{decoded_instr['rs']} + {hex(immediate)})")
-        
-        elif opcode == 0x23:  # LW
-            addr = (rs + immediate) & 0xFFFFFFFF
-            if addr >= self.memory_bus.MEMORY_SIZE:
-                raise MemoryError(f"Load address out of bounds: {hex(addr)}")
-            self.registers[rt_idx] = self.memory_bus.read_word(addr)
+        self._lookup_handler(decoded_instr)(decoded_instr)
+    
+    def _execute_invalid(self, decoded_instr):
+        """Reject an instruction with an unsupported opcode."""
+        raise ValueError(f"Unknown opcode: {hex(decoded_instr.opcode)}")
+    
+    def _execute_nop(self, decoded_instr):
+        """Execute an R-type instruction with an unsupported funct (no effect)."""
+        pass
+    
+    # R-type Instructions
+    def _execute_add(self, decoded_instr):
+        """Execute ADD: rd = rs + rt (wraps modulo 2**32)."""
+        regs = self.registers
+        rd_idx = decoded_instr.rd
+        if rd_idx:
+            regs[rd_idx] = (regs[decoded_instr.rs] + regs[decoded_instr.rt]) & 0xFFFFFFFF
+        if self.trace:
+            print(f"ADD: r{rd_idx} = {hex(self.registers[rd_idx])} (r{decoded_instr.rs} + r{decoded_instr.rt})")
+    
+    def _execute_sub(self, decoded_instr):
+        """Execute SUB: rd = rs - rt (wraps modulo 2**32)."""
+        regs = self.registers
+        rd_idx = decoded_instr.rd
+        if rd_idx:
+            regs[rd_idx] = (regs[decoded_instr.rs] - regs[decoded_instr.rt]) & 0xFFFFFFFF
+        if self.trace:
+            print(f"SUB: r{rd_idx} = {hex(self.registers[rd_idx])} (r{decoded_instr.rs} - r{decoded_instr.rt})")
+    
+    def _execute_slt(self, decoded_instr):
+        """Execute SLT: rd = 1 if rs < rt else 0 (signed comparison)."""
+        regs = self.registers
+        rd_idx = decoded_instr.rd
+        if rd_idx:
+            regs[rd_idx] = int(_to_signed(regs[decoded_instr.rs]) < _to_signed(regs[decoded_instr.rt]))
+        if self.trace:
+            print(f"SLT: r{rd_idx} = {hex(self.registers[rd_idx])} (r{decoded_instr.rs} < r{decoded_instr.rt})")
+    
+    # I-type Instructions (immediates are already sign-extended by decode)
+    def _execute_addi(self, decoded_instr):
+        """Execute ADDI: rt = rs + immediate."""
+        rt_idx = decoded_instr.rt
+        immediate = decoded_instr.immediate
+        if rt_idx:
+            self.registers[rt_idx] = (self.registers[decoded_instr.rs] + immediate) & 0xFFFFFFFF
+        if self.trace:
+            print(f"ADDI: r{rt_idx} = {hex(self.registers[rt_idx])} (r{decoded_instr.rs} + {hex(immediate)})")
+    
+    def _execute_lw(self, decoded_instr):
+        """Execute LW: rt = Memory[rs + offset]."""
+        rt_idx = decoded_instr.rt
+        addr = (self.registers[decoded_instr.rs] + decoded_instr.immediate) & 0xFFFFFFFF
+        if addr >= self._memory_size:
+            raise MemoryError(f"Load address out of bounds: {hex(addr)}")
+        value = self._mem_read(addr)
+        if rt_idx:
+            self.registers[rt_idx] = value
+        if self.trace:
             print(f"LW: r{rt_idx} = {hex(self.registers[rt_idx])} (mem[{hex(addr)}])")
-        
-        elif opcode == 0x2B:  # SW
-            addr = (rs + immediate) & 0xFFFFFFFF
-            if addr >= self.memory_bus.MEMORY_SIZE:
-                raise MemoryError(f"Store address out of bounds: {hex(addr)}")
-            value = self.registers[rt_idx]
-            self.memory_bus.write_word(addr, value)
+    
+    def _execute_sw(self, decoded_instr):
+        """Execute SW: Memory[rs + offset] = rt."""
+        rt_idx = decoded_instr.rt
+        addr = (self.registers[decoded_instr.rs] + decoded_instr.immediate) & 0xFFFFFFFF
+        if addr >= self._memory_size:
+            raise MemoryError(f"Store address out of bounds: {hex(addr)}")
+        value = self.registers[rt_idx]
+        self._mem_write(addr, value)
+        # Keep instruction fetches coherent with stores into code
+        self.icache.invalidate(addr)
+        if self.trace:
             print(f"SW: mem[{hex(addr)}] = {hex(value)} (r{rt_idx})")
-        
-        elif opcode == 0x05:  # BNE
-            if self.registers[decoded_instr['rs']] != self.registers[rt_idx]:
-                # Sign extend immediate for branch offset
-                if immediate & 0x8000:
-                    immediate |= -1 << 16
-                # Calculate branch target (PC-relative)
-                self.branch_target = (self.pc + 4 + (immediate << 2)) & 0xFFFFFFFF
-                self.branch_taken = True
+    
+    def _execute_bne(self, decoded_instr):
+        """Execute BNE: branch if rs != rt."""
+        if self.registers[decoded_instr.rs] != self.registers[decoded_instr.rt]:
+            # Calculate branch target (PC-relative)
+            self.branch_target = (self.pc + 4 + decoded_instr.branch_offset) & 0xFFFFFFFF
+            self.branch_taken = True
+            if self.trace:
                 print(f"BNE: Taking branch from {hex(self.pc)} to {hex(self.branch_target)}")
-            else:
-                print(f"BNE: Branch not taken at {hex(self.pc)}")
-        
-        elif opcode == 0x04:  # BEQ
-            if self.registers[decoded_instr['rs']] == self.registers[rt_idx]:
-                # Sign extend immediate for branch offset
-                if immediate & 0x8000:
-                    immediate |= -1 << 16
-                # Calculate branch target (PC-relative)
-                self.branch_target = (self.pc + 4 + (immediate << 2)) & 0xFFFFFFFF
-                self.branch_taken = True
+        elif self.trace:
+            print(f"BNE: Branch not taken at {hex(self.pc)}")
+    
+    def _execute_beq(self, decoded_instr):
+        """Execute BEQ: branch if rs == rt."""
+        if self.registers[decoded_instr.rs] == self.registers[decoded_instr.rt]:
+            # Calculate branch target (PC-relative)
+            self.branch_target = (self.pc + 4 + decoded_instr.branch_offset) & 0xFFFFFFFF
+            self.branch_taken = True
+            if self.trace:
                 print(f"BEQ: Taking branch from {hex(self.pc)} to {hex(self.branch_target)}")
-            else:
-                print(f"BEQ: Branch not taken at {hex(self.pc)}")
-        
-        # Ensure R0 stays 0
-        self.registers[0] = 0
+        elif self.trace:
+            print(f"BEQ: Branch not taken at {hex(self.pc)}")
     
-    def _execute_j_type(self, decoded_instr):
-        """Execute J-type instruction."""
-        opcode = decoded_instr['opcode']
-        target_addr = decoded_instr['target']
-        
-        if opcode == 0x02:  # J
-            # Jump target is in the current 256MB region
-            target = (self.pc & 0xF0000000) | (target_addr << 2)
-            if target >= self.memory_bus.MEMORY_SIZE:
-                raise MemoryError(f"Jump target out of bounds: {hex(target)}")
+    # J-type Instructions
+    def _execute_j(self, decoded_instr):
+        """Execute J: jump within the current 256MB region."""
+        target = decoded_instr.jump_target
+        if target >= self._memory_size:
+            raise MemoryError(f"Jump target out of bounds: {hex(target)}")
+        if self.trace:
             print(f"J: Taking jump from {hex(self.pc)} to {hex(target)}")
-            self.pc = target - 4  # -4 because we'll add 4 in update_pc()
+        self.pc = target - 4  # -4 because we'll add 4 in update_pc()
+    
+    def _execute_jal(self, decoded_instr):
+        """Execute JAL: save the return address in $ra and jump."""
+        # Save return address (next instruction)
+        return_addr = (self.pc + 4) & 0xFFFFFFFF
+        self.registers[31] = return_addr  # Store return address in $ra
         
-        elif opcode == 0x03:  # JAL
-            # Save return address (next instruction)
-            return_addr = self.pc + 4
-            self.registers[31] = return_addr  # Store return address in $ra
-            
-            # Jump target is in the current 256MB region
-            target = (self.pc & 0xF0000000) | (target_addr << 2)
-            if target >= self.memory_bus.MEMORY_SIZE:
-                raise MemoryError(f"Jump target out of bounds: {hex(target)}")
+        target = decoded_instr.jump_target
+        if target >= self._memory_size:
+            raise MemoryError(f"Jump target out of bounds: {hex(target)}")
+        if self.trace:
             print(f"JAL: Taking jump-and-link from {hex(self.pc)} to {hex(target)}")
-            self.pc = target - 4  # -4 because we'll add 4 in update_pc()
+        self.pc = target - 4  # -4 because we'll add 4 in update_pc()
+    
+    # Special Instructions
+    def _execute_halt(self, decoded_instr):
+        """Execute HALT instruction."""
+        print("\nCPU halted")
+        self.halted = True
     
     def update_pc(self):
         """Update program counter."""
@@ -223,5 +284,5 @@ class CPU:
             self.branch_target = None
         else:
             self.pc = (self.pc + 4) & 0xFFFFFFFF
-        if self.pc >= self.memory_bus.MEMORY_SIZE:
+        if self.pc >= self._memory_size:
             raise MemoryError(f"Program counter out of bounds: {hex(self.pc)}")
@@ -1,11 +1,56 @@
+import functools
 import re
+from pathlib import Path
 from typing import Dict, List, Tuple, Union
 import struct
+import sys
+
+# Memory operand of the form offset($reg), e.g. 0x10($sp)
+_MEM_RE = re.compile(r'(-?(?:0x)?[0-9a-fA-F]+)\((\$\w+)\)')
+
+# Separators between an instruction's mnemonic and operands
+_TOKEN_RE = re.compile(r'[,\s]+')
+
+# Register operand (without the leading '$') -> register number, covering
+# both the ABI names and the plain numeric forms '0'..'31'
+_REG_MAP = {
+    'zero': 0, 'at': 1, 'v0': 2, 'v1': 3,
+    'a0': 4, 'a1': 5, 'a2': 6, 'a3': 7,
+    't0': 8, 't1': 9, 't2': 10, 't3': 11,
+    't4': 12, 't5': 13, 't6': 14, 't7': 15,
+    's0': 16, 's1': 17, 's2': 18, 's3': 19,
+    's4': 20, 's5': 21, 's6': 22, 's7': 23,
+    't8': 24, 't9': 25, 'k0': 26, 'k1': 27,
+    'gp': 28, 'sp': 29, 'fp': 30, 'ra': 31,
+    **{str(i): i for i in range(32)}
+}
+
+def _sx16(value: int) -> int:
+    """Sign-extend the low 16 bits of value without branching."""
+    return ((value & 0xFFFF) ^ 0x8000) - 0x8000
+
+# One memory initialization line: "address: data", optional trailing comment
+_INIT_RE = re.compile(r'\s*(?:([^\s:#]+)\s*:\s*([^\s:#]+))?\s*(?:#.*)?')
 
 class InstructionParserError(Exception):
     """Custom exception for instruction parsing errors."""
     pass
 
+@functools.lru_cache(maxsize=512)
+def _parse_number(num_str: str) -> int:
+    """Parse number in decimal, hex, or binary format."""
+    num_str = num_str.strip().lower()
+    
+    try:
+        if num_str.startswith('0x'):
+            return int(num_str[2:], 16)
+        elif num_str.startswith('0b'):
+            return int(num_str[2:], 2)
+        else:
+            return int(num_str)
+    except ValueError:
+        raise InstructionParserError(f"Invalid number format: {num_str}")
+
 class InstructionParser:
     # Instruction formats and opcodes
     R_TYPE_OPCODES = {
@@ -38,68 +83,81 @@ class InstructionParser:
         'CACHE': 0x3E,  # Custom opcode for CACHE
     }
     
+    # Fixed per-instance attributes, stored in slots rather than a dict
+    __slots__ = ('current_address', 'symbol_table', 'machine_code',
+                 '_label_id', '_label_addr')
+    
     def __init__(self):
         """Initialize instruction parser."""
         # Initialize state
         self.current_address = 0
         self.symbol_table = {}
+        self._label_id = {}  # Label name -> integer id
+        self._label_addr = []  # Label id -> address (None until defined)
         self.machine_code = bytearray()
     
     def parse_file(self, filename: str) -> None:
         """Parse assembly file and generate machine code."""
-        # First pass: collect labels
+        # Single read of the file: collect labels and tokenized instructions
         self.current_address = 0
         self.symbol_table = {}
+        self._label_id = {}
+        self._label_addr = []
+        pending = []
         
-        with open(filename, 'r') as f:
-            for line in f:
-                line = line.strip()
-                # Skip empty lines and comments
-                if not line or line.startswith('#'):
+        for line in self._read_source_lines(filename):
+            # Check for label
+            if ':' in line:
+                label, rest = line.split(':', 1)
+                label = sys.intern(label.strip())
+                self.symbol_table[label] = self.current_address
+                self._label_addr[self._label_ref(label)] = self.current_address
+                line = rest.strip()
+                if not line:  # If line only contained label
                     continue
                     
-                # Remove inline comments
-                if '#' in line:
-                    line = line[:line.index('#')].strip()
-                    
-                # Check for label
-                if ':' in line:
-                    label, rest = line.split(':', 1)
-                    label = label.strip()
-                    self.symbol_table[label] = self.current_address
-                    line = rest.strip()
-                    if not line:  # If line only contained label
-                        continue
-                        
-                self.current_address += 4  # Each instruction is 4 bytes
+            parts = _TOKEN_RE.split(line.rstrip(', \t'))
+            pending.append((self._resolve(parts), parts))
+            self.current_address += 4  # Each instruction is 4 bytes
         
-        # Second pass: generate machine code
+        # Generate machine code from the tokenized instructions now that
+        # every label (including forward references) is known
         self.current_address = 0
-        self.machine_code = bytearray()
+        words = []
         
-        with open(filename, 'r') as f:
-            for line in f:
-                line = line.strip()
-                # Skip empty lines and comments
-                if not line or line.startswith('#'):
-                    continue
-                    
-                # Remove inline comments
-                if '#' in line:
-                    line = line[:line.index('#')].strip()
-                    
-                # Remove label if present
-                if ':' in line:
-                    _, line = line.split(':', 1)
-                    line = line.strip()
-                    if not line:
-                        continue
-                        
-                # Parse instruction
-                parts = line.replace(',', ' ').split()
-                instruction = self._parse_instruction(parts)
-                self.machine_code.extend(instruction.to_bytes(4, byteorder='big'))
-                self.current_address += 4
+        for (handler, opcode, funct, _), parts in pending:
+            words.append(handler(self, parts, opcode, funct))
+            self.current_address += 4
+        
+        # Pack the whole program into big-endian words in one call
+        self.machine_code = bytearray(4 * len(words))
+        struct.pack_into(f'>{len(words)}I', self.machine_code, 0, *words)
+    
+    def _label_ref(self, label: str) -> int:
+        """Get the integer id for a label, allocating one on first use."""
+        # Interned so repeated references share one key object
+        label = sys.intern(label)
+        label_id = self._label_id.get(label)
+        if label_id is None:
+            label_id = self._label_id[label] = len(self._label_addr)
+            self._label_addr.append(None)
+        return label_id
+    
+    def _label_target(self, label_id: int) -> int:
+        """Get the address of a label by id."""
+        target_addr = self._label_addr[label_id]
+        if target_addr is None:
+            label = next(name for name, i in self._label_id.items() if i == label_id)
+            raise InstructionParserError(f"Undefined label: {label}")
+        return target_addr
+    
+    @staticmethod
+    def _read_source_lines(filename: str) -> List[str]:
+        """Read a source file, returning its lines with comments and blanks removed."""
+        # One binary read and one decode; ASCII sources take UTF-8's fast path
+        text = Path(filename).read_bytes().decode('utf-8')
+        lines = [line.partition('#')[0].strip() for line in text.splitlines()]
+        return [line for line in lines if line]
     
     def parse_memory_init(self, file_path: str) -> Dict[int, int]:
         """
@@ -114,188 +172,129 @@ class InstructionParser:
         memory_data = {}
         
         try:
-            with open(file_path, 'r') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    
-                    # Skip empty lines and comments
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    # Parse address:data format
-                    try:
-                        addr_str, data_str = line.split(':')
-                        # Remove any comments from data
-                        data_str = data_str.split('#')[0].strip()
-                        
-                        address = self._parse_number(addr_str.strip())
-                        data = self._parse_number(data_str.strip())
-                        
-                        if address % 4 != 0:
-                            raise InstructionParserError(f"Address must be word-aligned: {hex(address)}")
-                            
-                        memory_data[address] = data
-                        
-                    except ValueError:
-                        raise InstructionParserError(f"Invalid memory initialization format on line {line_num}")
-                        
+            text = Path(file_path).read_bytes().decode('utf-8')
         except FileNotFoundError:
             raise InstructionParserError(f"Memory initialization file not found: {file_path}")
-            
-        return memory_data
-    
-    def _first_pass(self, file_path: str) -> None:
-        """Collect all labels and their addresses."""
-        current_address = 0
         
-        with open(file_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                
-                # Skip empty lines and comments
-                if not line or line.startswith('#'):
-                    continue
-                
-                # Remove comments from the line
-                line = line.split('#')[0].strip()
+        for line_num, line in enumerate(text.splitlines(), 1):
+            # Parse address:data format (blank and comment-only lines match
+            # with no fields)
+            match = _INIT_RE.fullmatch(line)
+            if match is None:
+                raise InstructionParserError(f"Invalid memory initialization format on line {line_num}")
+            addr_str, data_str = match.groups()
+            if addr_str is None:
+                continue
+            
+            address = self._parse_number(addr_str)
+            if address % 4 != 0:
+                raise InstructionParserError(f"Address must be word-aligned: {hex(address)}")
                 
-                # Check for labels
-                if ':' in line:
-                    label = line.split(':')[0].strip()
-                    self.symbol_table[label] = current_address
-                    
-                # Only increment address for actual instructions
-                if not line.endswith(':'):
-                    current_address += 4
+            memory_data[address] = self._parse_number(data_str)
+            
+        return memory_data
     
     def _parse_instruction(self, parts: List[str]) -> int:
         """Parse a single instruction into machine code."""
-        # Get instruction type
-        instruction = parts[0].upper()
+        handler, opcode, funct, _ = self._resolve(parts)
+        return handler(self, parts, opcode, funct)
+    
+    def _resolve(self, parts: List[str]) -> Tuple:
+        """
+        Look up the encoder entry for a tokenized instruction.
         
-        if instruction in self.R_TYPE_OPCODES:
-            return self._parse_r_type(parts)
-        elif instruction in self.I_TYPE_OPCODES:
-            return self._parse_i_type(parts)
-        elif instruction in self.J_TYPE_OPCODES:
-            return self._parse_j_type(parts)
-        elif instruction in self.SPECIAL_INSTRUCTIONS:
-            return self._parse_special_instruction(parts)
-        else:
-            raise InstructionParserError(f"Unknown instruction: {instruction}")
+        The mnemonic is uppercased in place and any branch/jump target is
+        replaced with its integer label id, so encoding needs no further
+        string lookups.
+        
+        Args:
+            parts: Instruction tokens, modified in place
+            
+        Returns:
+            The (handler, opcode, funct, label_operand) dispatch entry
+        """
+        # A single hash resolves the handler and every encoding field
+        mnemonic = sys.intern(parts[0].upper())
+        try:
+            entry = self._DISPATCH[mnemonic]
+        except KeyError:
+            raise InstructionParserError(f"Unknown instruction: {mnemonic}")
+        parts[0] = mnemonic
+        
+        operand = entry[3]
+        if operand and len(parts) == operand + 1:
+            parts[operand] = self._label_ref(parts[operand])
+        return entry
     
-    def _parse_r_type(self, parts: List[str]) -> int:
+    def _parse_r_type(self, parts: List[str], opcode: int, funct: int) -> int:
         """Parse R-type instruction."""
         if len(parts) != 4:
             raise InstructionParserError(f"Invalid R-type instruction format: {' '.join(parts)}")
             
-        opcode = self.R_TYPE_OPCODES[parts[0].upper()]
-        funct = self.R_TYPE_FUNCTS[parts[0].upper()]
         rd = self._parse_register(parts[1])
         rs = self._parse_register(parts[2])
         rt = self._parse_register(parts[3])
         
         return (opcode << 26) | (rs << 21) | (rt << 16) | (rd << 11) | funct
     
-    def _parse_i_type(self, parts: List[str]) -> int:
-        """Parse I-type instruction."""
-        opcode = self.I_TYPE_OPCODES[parts[0].upper()]
-        
-        if parts[0].upper() in ['LW', 'SW']:
-            # Handle memory access format: LW rt, offset(rs)
-            if len(parts) != 3:
-                raise InstructionParserError(f"Invalid memory access format: {' '.join(parts)}")
-                
-            rt = self._parse_register(parts[1])
-            # Parse offset(rs) format
-            offset_base = parts[2].strip()
-            # Handle hex numbers in offset
-            match = re.match(r'(-?(?:0x)?[0-9a-fA-F]+)\((\$\w+)\)', offset_base)
-            if not match:
-                raise InstructionParserError(f"Invalid memory access format: {offset_base}")
-            
-            try:
-                immediate = self._parse_number(match.group(1))
-                # Sign extend 16-bit immediate
-                immediate = immediate & 0xFFFF
-                if immediate & 0x8000:
-                    immediate |= -1 << 16
-            except InstructionParserError:
-                raise InstructionParserError(f"Invalid offset in memory access: {match.group(1)}")
-                
-            rs = self._parse_register(match.group(2))
-            
-        elif parts[0].upper() == 'BNE':
-            # Handle branch instruction: BNE rs, rt, label
-            if len(parts) != 4:
-                raise InstructionParserError(f"Invalid branch instruction format: {' '.join(parts)}")
-                
-            rs = self._parse_register(parts[1])
-            rt = self._parse_register(parts[2])
-            
-            # Calculate branch offset
-            label = parts[3].strip()
-            if label not in self.symbol_table:
-                raise InstructionParserError(f"Undefined label: {label}")
-                
-            # Calculate relative branch offset in words (4 bytes per word)
-            target_addr = self.symbol_table[label]
-            current_addr = self.current_address + 4  # PC points to next instruction
-            offset = (target_addr - current_addr) >> 2  # Divide by 4 to get word offset
-            
-            # Check if offset fits in 16 bits
-            if not -32768 <= offset <= 32767:
-                raise InstructionParserError(f"Branch offset too large: {offset}")
-                
-            immediate = offset & 0xFFFF
-            
-        elif parts[0].upper() == 'BEQ':
-            # Handle branch instruction: BEQ rs, rt, label
-            if len(parts) != 4:
-                raise InstructionParserError(f"Invalid branch instruction format: {' '.join(parts)}")
-                
-            rs = self._parse_register(parts[1])
-            rt = self._parse_register(parts[2])
+    def _parse_addi(self, parts: List[str], opcode: int, funct: None) -> int:
+        """Parse ADDI instruction: ADDI rt, rs, immediate."""
+        if len(parts) != 4:
+            raise InstructionParserError(f"Invalid I-type instruction format: {' '.join(parts)}")
             
-            # Calculate branch offset
-            label = parts[3].strip()
-            if label not in self.symbol_table:
-                raise InstructionParserError(f"Undefined label: {label}")
-                
-            # Calculate relative branch offset in words (4 bytes per word)
-            target_addr = self.symbol_table[label]
-            current_addr = self.current_address + 4  # PC points to next instruction
-            offset = (target_addr - current_addr) >> 2  # Divide by 4 to get word offset
+        rt = self._parse_register(parts[1])
+        rs = self._parse_register(parts[2])
+        immediate = self._parse_immediate(parts[3])
+        
+        return (opcode << 26) | (rs << 21) | (rt << 16) | (immediate & 0xFFFF)
+    
+    def _parse_lw_sw(self, parts: List[str], opcode: int, funct: None) -> int:
+        """Parse memory access instruction: LW/SW rt, offset(rs)."""
+        if len(parts) != 3:
+            raise InstructionParserError(f"Invalid memory access format: {' '.join(parts)}")
             
-            # Check if offset fits in 16 bits
-            if not -32768 <= offset <= 32767:
-                raise InstructionParserError(f"Branch offset too large: {offset}")
-                
-            immediate = offset & 0xFFFF
+        rt = self._parse_register(parts[1])
+        # Parse offset(rs) format
+        offset_base = parts[2].strip()
+        # Handle hex numbers in offset
+        match = _MEM_RE.match(offset_base)
+        if not match:
+            raise InstructionParserError(f"Invalid memory access format: {offset_base}")
+        
+        try:
+            immediate = _sx16(self._parse_number(match.group(1)))
+        except InstructionParserError:
+            raise InstructionParserError(f"Invalid offset in memory access: {match.group(1)}")
             
-        else:  # ADDI
-            if len(parts) != 4:
-                raise InstructionParserError(f"Invalid I-type instruction format: {' '.join(parts)}")
-                
-            rt = self._parse_register(parts[1])
-            rs = self._parse_register(parts[2])
-            immediate = self._parse_immediate(parts[3])
+        rs = self._parse_register(match.group(2))
         
         return (opcode << 26) | (rs << 21) | (rt << 16) | (immediate & 0xFFFF)
     
-    def _parse_j_type(self, parts: List[str]) -> int:
+    def _parse_bne_beq(self, parts: List[str], opcode: int, funct: None) -> int:
+        """Parse branch instruction: BNE/BEQ rs, rt, label."""
+        if len(parts) != 4:
+            raise InstructionParserError(f"Invalid branch instruction format: {' '.join(parts)}")
+            
+        rs = self._parse_register(parts[1])
+        rt = self._parse_register(parts[2])
+        
+        # Calculate relative branch offset in words (4 bytes per word)
+        target_addr = self._label_target(parts[3])
+        current_addr = self.current_address + 4  # PC points to next instruction
+        offset = (target_addr - current_addr) >> 2  # Divide by 4 to get word offset
+        
+        # Check if offset fits in 16 bits
+        if not -32768 <= offset <= 32767:
+            raise InstructionParserError(f"Branch offset too large: {offset}")
+            
+        return (opcode << 26) | (rs << 21) | (rt << 16) | (offset & 0xFFFF)
+    
+    def _parse_j_type(self, parts: List[str], opcode: int, funct: None) -> int:
         """Parse J-type instruction."""
         if len(parts) != 2:
             raise InstructionParserError(f"Invalid J-type instruction format: {' '.join(parts)}")
             
-        opcode = self.J_TYPE_OPCODES[parts[0].upper()]
-        label = parts[1].strip()
-        
-        # Get target address from symbol table
-        if label not in self.symbol_table:
-            raise InstructionParserError(f"Undefined label: {label}")
-            
-        target_addr = self.symbol_table[label]
+        target_addr = self._label_target(parts[1])
         # Target address is word-aligned (lower 2 bits are 0)
         target = target_addr >> 2
         
@@ -305,75 +304,60 @@ class InstructionParser:
             
         return (opcode << 26) | (target & 0x3FFFFFF)
     
-    def _parse_special_instruction(self, parts: List[str]) -> int:
+    def _parse_special_instruction(self, parts: List[str], opcode: int, funct: None) -> int:
         """Parse special instructions (HALT, CACHE)."""
         if len(parts) != 1:
             raise InstructionParserError(f"Invalid special instruction format: {' '.join(parts)}")
             
-        opcode = self.SPECIAL_INSTRUCTIONS[parts[0].upper()]
         return (opcode << 26)  # Special instructions use only opcode
     
-    def get_machine_code(self) -> bytes:
-        """Get the generated machine code."""
-        return bytes(self.machine_code)
+    # Mnemonic -> (handler, opcode, funct, label_operand), built from the
+    # opcode tables above; label_operand is the token index of a branch/jump
+    # target (0 when the instruction takes no label)
+    _DISPATCH = {}
+    for _name in R_TYPE_OPCODES:
+        _DISPATCH[_name] = (_parse_r_type, R_TYPE_OPCODES[_name], R_TYPE_FUNCTS[_name], 0)
+    _DISPATCH['ADDI'] = (_parse_addi, I_TYPE_OPCODES['ADDI'], None, 0)
+    for _name in ('LW', 'SW'):
+        _DISPATCH[_name] = (_parse_lw_sw, I_TYPE_OPCODES[_name], None, 0)
+    for _name in ('BNE', 'BEQ'):
+        _DISPATCH[_name] = (_parse_bne_beq, I_TYPE_OPCODES[_name], None, 3)
+    for _name in J_TYPE_OPCODES:
+        _DISPATCH[_name] = (_parse_j_type, J_TYPE_OPCODES[_name], None, 1)
+    for _name in SPECIAL_INSTRUCTIONS:
+        _DISPATCH[_name] = (_parse_special_instruction, SPECIAL_INSTRUCTIONS[_name], None, 0)
+    del _name
+    
+    def get_machine_code(self) -> memoryview:
+        """Get a read-only view of the generated machine code (no copy)."""
+        return memoryview(self.machine_code).toreadonly()
     
     def _parse_immediate(self, imm_str: str) -> int:
         """Parse immediate value (decimal, hex, or binary)."""
         try:
-            value = self._parse_number(imm_str)
-            # Sign extend 16-bit immediate
-            value = value & 0xFFFF
-            if value & 0x8000:
-                value |= -1 << 16
-            return value
+            return _sx16(self._parse_number(imm_str))
         except InstructionParserError:
             raise InstructionParserError(f"Invalid immediate value: {imm_str}")
     
     @staticmethod
     def _parse_register(reg_str: str) -> int:
         """Parse register string (e.g., '$1', '$ra') to number."""
-        # Remove any trailing comma
-        reg_str = reg_str.rstrip(',')
-        
-        if not reg_str.startswith('$'):
+        if reg_str[:1] != '$':
             raise InstructionParserError(f"Invalid register format: {reg_str}")
-            
-        reg_str = reg_str[1:]  # Remove '$'
         
-        # Handle special register names
-        special_regs = {
-            'zero': 0, 'at': 1, 'v0': 2, 'v1': 3,
-            'a0': 4, 'a1': 5, 'a2': 6, 'a3': 7,
-            't0': 8, 't1': 9, 't2': 10, 't3': 11,
-            't4': 12, 't5': 13, 't6': 14, 't7': 15,
-            's0': 16, 's1': 17, 's2': 18, 's3': 19,
-            's4': 20, 's5': 21, 's6': 22, 's7': 23,
-            't8': 24, 't9': 25, 'k0': 26, 'k1': 27,
-            'gp': 28, 'sp': 29, 'fp': 30, 'ra': 31
-        }
+        name = reg_str[1:].rstrip(',')
+        try:
+            return _REG_MAP[name]
+        except KeyError:
+            pass
         
-        if reg_str in special_regs:
-            return special_regs[reg_str]
-            
+        # Numeric spellings the map does not list, e.g. '$05'
         try:
-            reg_num = int(reg_str)
-            if 0 <= reg_num <= 31:
-                return reg_num
-            raise InstructionParserError(f"Register number out of range: {reg_str}")
+            reg_num = int(name)
         except ValueError:
             raise InstructionParserError(f"Invalid register: {reg_str}")
+        if 0 <= reg_num <= 31:
+            return reg_num
+        raise InstructionParserError(f"Register number out of range: {reg_str}")
     
-    @staticmethod
-    def _parse_number(num_str: str) -> int:
-        """Parse number in decimal, hex, or binary format."""
-        num_str = num_str.strip().lower()
-        
-        try:
-            if num_str.startswith('0x'):
-                return int(num_str[2:], 16)
-            elif num_str.startswith('0b'):
-                return int(num_str[2:], 2)
-            else:
-                return int(num_str)
-        except ValueError:
-            raise InstructionParserError(f"Invalid number format: {num_str}")
+    _parse_number = staticmethod(_parse_number)
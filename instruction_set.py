@@ -1,60 +1,67 @@
+# MIPS instruction semantics as plain functions over unsigned 32-bit register
+# values. The CPU inlines these operations in its executors, so they are the
+# reference definitions only and must wrap and compare exactly as it does.
+
+# R-type Instructions
+def add(rd, rs, rt):
+    """Add: rd = rs + rt (wraps modulo 2**32)"""
+    return (rs + rt) & 0xFFFFFFFF
+
+def sub(rd, rs, rt):
+    """Subtract: rd = rs - rt (wraps modulo 2**32)"""
+    return (rs - rt) & 0xFFFFFFFF
+
+def slt(rd, rs, rt):
+    """Set Less Than: rd = 1 if rs < rt else 0 (signed comparison)"""
+    # Flipping the sign bit maps two's complement order onto unsigned order
+    return 1 if (rs ^ 0x80000000) < (rt ^ 0x80000000) else 0
+
+# I-type Instructions
+def addi(rt, rs, immediate):
+    """Add Immediate: rt = rs + immediate (sign-extended, wraps modulo 2**32)"""
+    return (rs + immediate) & 0xFFFFFFFF
+
+def lw(rt, rs, offset):
+    """Load Word: rt = Memory[rs + offset]"""
+    return (rs + offset) & 0xFFFFFFFF  # Returns address to load from
+
+def sw(rt, rs, offset):
+    """Store Word: Memory[rs + offset] = rt"""
+    return (rs + offset) & 0xFFFFFFFF  # Returns address to store to
+
+def bne(rs: int, rt: int, offset: int) -> bool:
+    """Branch if not equal."""
+    return rs != rt
+
+# J-type Instructions
+def j(target):
+    """Jump: PC = (PC & 0xF0000000) | (target << 2)"""
+    return target
+
+def jal(target, pc):
+    """Jump and Link: r31 = PC + 4; PC = (PC & 0xF0000000) | (target << 2)"""
+    return target, (pc + 4) & 0xFFFFFFFF
+
+# Special Instructions
+def halt():
+    """Halt the CPU"""
+    return True
+
+
 class InstructionSet:
     """
     MIPS instruction set implementation.
-    Each method represents a MIPS instruction and performs the corresponding operation.
-    All methods are static as they don't need instance state.
+    Namespace over the module-level instruction functions, kept for code that
+    still refers to InstructionSet; the CPU does not need an instance.
     """
-    
-    # R-type Instructions
-    @staticmethod
-    def add(rd, rs, rt):
-        """Add: rd = rs + rt"""
-        return rs + rt
-    
-    @staticmethod
-    def sub(rd, rs, rt):
-        """Subtract: rd = rs - rt"""
-        return rs - rt
-    
-    @staticmethod
-    def slt(rd, rs, rt):
-        """Set Less Than: rd = 1 if rs < rt else 0"""
-        return 1 if rs < rt else 0
-        
-    # I-type Instructions
-    @staticmethod
-    def addi(rt, rs, immediate):
-        """Add Immediate: rt = rs + immediate"""
-        return rs + immediate
-    
-    @staticmethod
-    def lw(rt, rs, offset):
-        """Load Word: rt = Memory[rs + offset]"""
-        return rs + offset  # Returns address to load from
-    
-    @staticmethod
-    def sw(rt, rs, offset):
-        """Store Word: Memory[rs + offset] = rt"""
-        return rs + offset  # Returns address to store to
-    
-    @staticmethod
-    def bne(rs: int, rt: int, offset: int) -> bool:
-        """Branch if not equal."""
-        return rs != rt
-        
-    # J-type Instructions
-    @staticmethod
-    def j(target):
-        """Jump: PC = (PC & 0xF0000000) | (target << 2)"""
-        return target
-    
-    @staticmethod
-    def jal(target, pc):
-        """Jump and Link: r31 = PC + 4; PC = (PC & 0xF0000000) | (target << 2)"""
-        return target, pc + 4
-        
-    # Special Instructions
-    @staticmethod
-    def halt():
-        """Halt the CPU"""
-        return True
+
+    add = staticmethod(add)
+    sub = staticmethod(sub)
+    slt = staticmethod(slt)
+    addi = staticmethod(addi)
+    lw = staticmethod(lw)
+    sw = staticmethod(sw)
+    bne = staticmethod(bne)
+    j = staticmethod(j)
+    jal = staticmethod(jal)
+    halt = staticmethod(halt)
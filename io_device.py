@@ -1,11 +1,14 @@
+from array import array
+
 class IODevice:
     """Simple I/O device for the CPU simulator."""
     
     def __init__(self):
         """Initialize the I/O device with default values."""
         self.input_value = 10  # Default number of Fibonacci numbers to calculate
-        self.output_buffer = []
+        self.output_buffer = array('I')  # Output words packed as unsigned 32-bit ints
         self.completion_status = 0
+        self._verbose = False  # Echo device writes to stdout
     
     def read(self, address: int) -> int:
         """Read from the I/O device.
@@ -28,11 +31,13 @@ class IODevice:
             value: The value to write
         """
         if address == 0xF0000004:  # Output device
-            self.output_buffer.append(value)
-            print(f"Fibonacci number generated: {value}")
+            self.output_buffer.append(value & 0xFFFFFFFF)
+            if self._verbose:
+                print(f"Fibonacci number generated: {value}")
         elif address == 0xF0000008:  # Completion status
             self.completion_status = value
-            print(f"Program completed. Generated {value} Fibonacci numbers.")
+            if self._verbose:
+                print(f"Program completed. Generated {value} Fibonacci numbers.")
     
     def set_input(self, value: int) -> None:
         """Set the input value for the device.
@@ -42,13 +47,21 @@ class IODevice:
         """
         self.input_value = value
     
+    def set_verbose(self, verbose: bool) -> None:
+        """Enable or disable echoing device writes to stdout.
+        
+        Args:
+            verbose: True to print each output and completion write
+        """
+        self._verbose = verbose
+    
     def get_output(self) -> list:
         """Get the output buffer contents.
         
         Returns:
             List of values written to the output device
         """
-        return self.output_buffer.copy()
+        return self.output_buffer.tolist()
     
     def get_completion_status(self) -> int:
         """Get the completion status.
@@ -4,7 +4,6 @@ from cpu import CPU
 from instruction_parser import InstructionParser
 from memory_bus import MemoryBus
 from cache import Cache
-from instruction_set import InstructionSet
 
 def main():
     # Parse command line arguments
@@ -13,12 +12,13 @@ def main():
     parser.add_argument('--memory-init', help='Memory initialization file')
     parser.add_argument('--num-fibonacci', type=int, default=10,
                        help='Number of Fibonacci numbers to calculate')
+    parser.add_argument('--trace', action='store_true',
+                       help='Print every executed instruction')
     args = parser.parse_args()
     
     # Initialize components
     memory_bus = MemoryBus()
-    instruction_set = InstructionSet()
-    cpu = CPU(memory_bus, instruction_set)
+    cpu = CPU(memory_bus, trace=args.trace)
     instruction_parser = InstructionParser()
     
     try:
@@ -27,13 +27,12 @@ def main():
         memory_bus.load_program(instruction_parser.get_machine_code(), 0)  # Load at address 0
         
         # Set up input value (number of Fibonacci numbers)
-        memory_bus.io_devices[memory_bus.IO_BASE] = args.num_fibonacci
+        memory_bus.set_io_value(memory_bus.IO_BASE, args.num_fibonacci)
         
         # Load memory initialization data if provided
         if args.memory_init:
             memory_data = instruction_parser.parse_memory_init(args.memory_init)
-            for addr, data in memory_data.items():
-                memory_bus.write_word(addr, data)
+            memory_bus.load_memory(memory_data)
         
         # Run the program
         print(f"\nExecuting program: {args.program}")
@@ -42,9 +41,16 @@ def main():
         cpu.run()
         
         # Print cache statistics
+        icache_stats = cpu.icache.get_stats()
+        print("\nInstruction Cache Statistics:")
+        print(f"Hits: {icache_stats['hits']}")
+        print(f"Misses: {icache_stats['misses']}")
+        print(f"Hit Rate: {icache_stats['hit_rate'] * 100:.2f}%")
+        print(f"Prefetch Hits: {icache_stats['prefetch_hits']}")
+        
         stats = memory_bus.get_stats()
         cache_stats = stats['cache']
-        print("\nCache Statistics:")
+        print("\nData Cache Statistics:")
         print(f"Hits: {cache_stats['hits']}")
         print(f"Misses: {cache_stats['misses']}")
         print(f"Hit Rate: {cache_stats['hit_rate']:.2f}%")
@@ -1,3 +1,21 @@
+import struct
+import sys
+import types
+from array import array
+
+# Address map
+MEMORY_SIZE = 0x100000  # 1MB of memory
+IO_BASE = 0xF0000000   # Base address for I/O devices
+
+# Big-endian 32-bit word codec for memory reads and writes
+_U32BE = struct.Struct('>I')
+
+# I/O device type codes, stored per slot alongside the device values
+_IO_UNTYPED = 0
+_IO_INPUT = 1
+_IO_OUTPUT = 2
+_IO_TYPE_CODES = {"input": _IO_INPUT, "output": _IO_OUTPUT}
+
 class MemoryBusError(Exception):
     """Custom exception for memory bus errors."""
     pass
@@ -5,25 +23,45 @@ class MemoryBusError(Exception):
 class Cache:
     """Simple direct-mapped cache implementation."""
     
-    def __init__(self, cache_size=1024, block_size=16):
-        """Initialize cache with given size and block size."""
+    # Fixed attribute layout: slot access instead of a per-instance dict
+    __slots__ = ('cache_size', 'num_entries', 'tags', 'data',
+                 'prefetch_enabled', 'hits', 'misses')
+    
+    def __init__(self, cache_size=1024, prefetch_enabled=True):
+        """Initialize cache with given size.
+        
+        Args:
+            cache_size: Cache size in bytes
+            prefetch_enabled: Let the bus fill the next word on a read miss
+        """
         self.cache_size = cache_size
-        self.block_size = block_size
-        self.cache = {}  # address -> value mapping
+        # One 32-bit word per entry, indexed by word address modulo the
+        # number of entries; a tag of -1 marks an empty entry
+        self.num_entries = cache_size // 4
+        self.tags = array('q', [-1]) * self.num_entries
+        self.data = array('I', [0]) * self.num_entries
+        self.prefetch_enabled = prefetch_enabled
         self.hits = 0
         self.misses = 0
     
     def read_word(self, address: int) -> int:
         """Read a word from cache."""
-        if address in self.cache:
+        index = (address >> 2) % self.num_entries
+        if self.tags[index] == address:
             self.hits += 1
-            return self.cache[address]
+            return self.data[index]
         self.misses += 1
         return None
     
     def write_word(self, address: int, value: int):
         """Write a word to cache."""
-        self.cache[address] = value
+        self._fill(address, value & 0xFFFFFFFF)
+    
+    def _fill(self, address: int, value: int):
+        """Store an already masked word in the entry its address maps to."""
+        index = (address >> 2) % self.num_entries
+        self.tags[index] = address
+        self.data[index] = value
     
     def get_stats(self):
         """Get cache statistics."""
@@ -37,7 +75,7 @@ class Cache:
     
     def clear(self):
         """Clear the cache."""
-        self.cache.clear()
+        self.tags[:] = array('q', [-1]) * self.num_entries
         self.hits = 0
         self.misses = 0
 
@@ -45,29 +83,77 @@ class Cache:
 class MemoryBus:
     """Memory bus that handles memory access and I/O devices."""
     
-    MEMORY_SIZE = 0x100000  # 1MB of memory
-    IO_BASE = 0xF0000000   # Base address for I/O devices
+    MEMORY_SIZE = MEMORY_SIZE
+    IO_BASE = IO_BASE
+    
+    # Fixed attribute layout: slot access instead of a per-instance dict
+    __slots__ = ('memory', 'cache', '_io_slot_of', '_io_addr_set', '_io_lut', '_io_values', '_io_type',
+                 'reads', 'writes', 'io_reads', 'io_writes')
     
     def __init__(self):
         """Initialize memory bus with memory and I/O devices."""
         self.memory = bytearray(self.MEMORY_SIZE)
         self.cache = Cache()
-        self.io_devices = {
-            self.IO_BASE: 8,  # Input device (number of Fibonacci numbers)
-            self.IO_BASE + 4: 0  # Output device
-        }
+        # I/O state: each device address maps to a small slot number that
+        # indexes a packed array of current device values
+        self._io_slot_of = {}
+        self._io_addr_set = frozenset()  # Device addresses, for membership tests
+        self._io_lut = array('i')  # Word offset from IO_BASE -> slot, or -1
+        self._io_values = array('I')
+        self._io_type = bytearray()  # Per-slot device type code (see _IO_TYPE_CODES)
+        self._io_type[self._add_io_slot(self.IO_BASE, 8)] = _IO_INPUT  # Number of Fibonacci numbers
+        self._io_type[self._add_io_slot(self.IO_BASE + 4, 0)] = _IO_OUTPUT
         self.reads = 0
         self.writes = 0
         self.io_reads = 0
         self.io_writes = 0
     
+    @property
+    def io_devices(self):
+        """Read-only snapshot of I/O device values keyed by address (see set_io_value)."""
+        return types.MappingProxyType(
+            {address: self._io_values[slot] for address, slot in self._io_slot_of.items()})
+    
+    def _add_io_slot(self, address, value=0):
+        """Allocate (or reuse) the value slot for an I/O address."""
+        if address < self.IO_BASE or address & 3:
+            raise MemoryBusError(f"Invalid I/O device address: {hex(address)}")
+        
+        slot = self._io_slot_of.get(address)
+        if slot is None:
+            slot = self._io_slot_of[address] = len(self._io_values)
+            self._io_values.append(0)
+            self._io_type.append(_IO_UNTYPED)
+            # Grow the lookup table to cover the new device's word
+            word = (address - self.IO_BASE) >> 2
+            if word >= len(self._io_lut):
+                self._io_lut.extend([-1] * (word + 1 - len(self._io_lut)))
+            self._io_lut[word] = slot
+            self._io_addr_set = frozenset(self._io_slot_of)
+        self._io_values[slot] = value & 0xFFFFFFFF
+        return slot
+    
+    def set_io_value(self, address, value):
+        """
+        Set the current value of an I/O device (e.g. to provide input).
+        
+        Args:
+            address: I/O device address
+            value: 32-bit value the device will return
+        """
+        slot = self._io_slot_of.get(address, -1)
+        if slot < 0:
+            raise MemoryError(f"Invalid I/O address: {hex(address)}")
+        self._io_values[slot] = value & 0xFFFFFFFF
+    
     def register_io_device(self, address, device_type):
         """Register an I/O device at the specified address."""
-        self.io_devices[address] = {"type": device_type, "value": 0}
+        slot = self._add_io_slot(address)
+        self._io_type[slot] = _IO_TYPE_CODES.get(device_type, _IO_UNTYPED)
     
     def _is_io_address(self, address):
         """Check if an address corresponds to an I/O device."""
-        return address in self.io_devices
+        return address in self._io_addr_set
     
     def load_memory(self, init_data):
         """
@@ -77,20 +163,32 @@ class MemoryBus:
             init_data: Dictionary mapping addresses to data values
         """
         try:
+            # Validate types and find the extent of the data in one pass
+            low = self.MEMORY_SIZE
+            high = 0
             for address, data in init_data.items():
-                if not isinstance(data, (int, bytes, bytearray)):
+                if isinstance(data, int):
+                    end = address + 4
+                elif isinstance(data, (bytes, bytearray)):
+                    end = address + len(data)
+                else:
                     raise MemoryBusError(f"Invalid data type at address {hex(address)}")
-                    
+                low = min(low, address)
+                high = max(high, end)
+                
+            if low < 0 or high > self.MEMORY_SIZE:
+                raise MemoryBusError(f"Address {hex(low if low < 0 else high)} out of memory bounds")
+            
+            # Copy with no per-entry checks; words are packed in place
+            memory = self.memory
+            for address, data in init_data.items():
                 if isinstance(data, int):
-                    # Convert integer to 4 bytes (32-bit)
-                    data_bytes = data.to_bytes(4, byteorder='big')
+                    _U32BE.pack_into(memory, address, data & 0xFFFFFFFF)
                 else:
-                    data_bytes = data
-                    
-                if address + len(data_bytes) > self.MEMORY_SIZE:
-                    raise MemoryBusError(f"Address {hex(address)} out of memory bounds")
-                    
-                self.memory[address:address + len(data_bytes)] = data_bytes
+                    memory[address:address + len(data)] = data
+            
+            # Invalidate cache
+            self.cache.clear()
                 
         except Exception as e:
             raise MemoryBusError(f"Error loading memory: {str(e)}")
@@ -108,9 +206,8 @@ class MemoryBus:
             if base_address + len(program) > self.MEMORY_SIZE:
                 raise MemoryBusError("Program too large for memory")
                 
-            # Clear memory first
-            for i in range(len(program)):
-                self.memory[base_address + i] = program[i]
+            # Copy the whole image with one slice assignment
+            self.memory[base_address:base_address + len(program)] = program
                 
             # Invalidate cache
             self.cache.clear()
@@ -118,48 +215,65 @@ class MemoryBus:
         except Exception as e:
             raise MemoryBusError(f"Error loading program: {str(e)}")
     
-    def read_word(self, address: int) -> int:
-        """Read a word from memory or I/O device."""
-        if address >= self.IO_BASE:
-            if address in self.io_devices:
-                self.io_reads += 1
-                return self.io_devices[address]
-            raise MemoryError(f"Invalid I/O address: {hex(address)}")
+    def read_words(self, address: int, nwords: int) -> array:
+        """
+        Read consecutive words in one batch and cache them.
         
-        if address + 4 > self.MEMORY_SIZE:
-            raise MemoryError(f"Memory read out of bounds: {hex(address)}")
+        Args:
+            address: Address of the first word
+            nwords: Number of words to read
+            
+        Returns:
+            array('I') holding the word values
+        """
+        end = address + 4 * nwords
+        if nwords < 0 or address < 0 or end > self.MEMORY_SIZE:
+            raise MemoryError(f"Memory block read out of bounds: {hex(address)}")
         
-        # Try to read from cache first
-        value = self.cache.read_word(address)
-        if value is not None:
-            return value
+        words = array('I')
+        words.frombytes(memoryview(self.memory)[address:end])
+        if sys.byteorder == 'little':
+            words.byteswap()  # Memory is big-endian
         
-        # Cache miss, read from memory
-        value = int.from_bytes(self.memory[address:address + 4], byteorder='big')
-        self.cache.write_word(address, value)
-        self.reads += 1
-        return value
+        fill = self.cache._fill
+        for i, value in enumerate(words):
+            fill(address + 4 * i, value)
+        self.reads += nwords
+        return words
+    
+    def write_words(self, address: int, values) -> None:
+        """
+        Write consecutive words in one batch, updating the cache.
         
-    def write_word(self, address: int, value: int):
-        """Write a word to memory or I/O device."""
-        if address >= self.IO_BASE:
-            if address in self.io_devices:
-                self.io_devices[address] = value
-                self.io_writes += 1
-                return
-            raise MemoryError(f"Invalid I/O address: {hex(address)}")
+        Args:
+            address: Address of the first word
+            values: 32-bit values to write
+        """
+        values = [value & 0xFFFFFFFF for value in values]
+        nwords = len(values)
+        if address < 0 or address + 4 * nwords > self.MEMORY_SIZE:
+            raise MemoryError(f"Memory block write out of bounds: {hex(address)}")
         
-        if address + 4 > self.MEMORY_SIZE:
-            raise MemoryError(f"Memory write out of bounds: {hex(address)}")
+        struct.pack_into(f'>{nwords}I', self.memory, address, *values)
         
-        # Write to cache
-        self.cache.write_word(address, value)
+        fill = self.cache._fill
+        for i, value in enumerate(values):
+            fill(address + 4 * i, value)
+        self.writes += nwords
+    
+    def as_bytes_view(self) -> memoryview:
+        """
+        Get a zero-copy view of the backing memory.
         
-        # Write to memory
-        self.memory[address:address + 4] = value.to_bytes(4, byteorder='big')
-        self.writes += 1
+        Returns:
+            memoryview over the full memory bytearray
+        """
+        return memoryview(self.memory)
     
-    def read(self, address):
+    # The trailing underscore parameters of read/write are not part of the
+    # interface: they bind constants and helpers as fast locals
+    def read(self, address, _IO_BASE=IO_BASE, _LAST_WORD=MEMORY_SIZE - 4,
+             _unpack=_U32BE.unpack_from):
         """
         Read a word (4 bytes) from memory or I/O device.
         
@@ -169,27 +283,38 @@ class MemoryBus:
         Returns:
             32-bit integer value
         """
-        # Check for I/O access
-        if address >= self.IO_BASE:
-            if address in self.io_devices:
-                return self.io_devices[address]
-            raise MemoryError(f"Invalid I/O address: {hex(address)}")
-            
-        # Check address bounds
-        if not (0 <= address < self.MEMORY_SIZE - 3):
+        # A single range test admits RAM; everything else is I/O or an error
+        if not 0 <= address <= _LAST_WORD:
+            if address >= _IO_BASE:
+                slot = self._io_slot_of.get(address, -1)
+                if slot >= 0:
+                    self.io_reads += 1
+                    return self._io_values[slot]
+                raise MemoryError(f"Invalid I/O address: {hex(address)}")
             raise MemoryError(f"Memory read out of bounds: {hex(address)}")
-            
-        # Check if word is in cache
-        word = self.cache.read_word(address)
-        if word is not None:
-            return word
-            
-        # Word not in cache, read from memory
-        word = int.from_bytes(self.memory[address:address + 4], byteorder='big')
+        
+        # Try to read from cache first (probe inlined to skip two calls)
+        cache = self.cache
+        index = (address >> 2) % cache.num_entries
+        if cache.tags[index] == address:
+            cache.hits += 1
+            return cache.data[index]
+        cache.misses += 1
+        
+        # Cache miss, read from memory and fill the entry
+        value = _unpack(self.memory, address)[0]
+        cache._fill(address, value)
         self.reads += 1
-        return word
+        
+        # Next-word prefetch: sequential walks then hit on the following word
+        if cache.prefetch_enabled:
+            next_addr = address + 4
+            if next_addr <= _LAST_WORD:
+                cache._fill(next_addr, _unpack(self.memory, next_addr)[0])
+        return value
     
-    def write(self, address, data):
+    def write(self, address, data, _IO_BASE=IO_BASE, _LAST_WORD=MEMORY_SIZE - 4,
+              _pack=_U32BE.pack_into):
         """
         Write a word (4 bytes) to memory or I/O device.
         
@@ -197,62 +322,65 @@ class MemoryBus:
             address: Memory address to write to
             data: 32-bit integer value to write
         """
-        # Check for I/O access
-        if address >= self.IO_BASE:
-            if address in self.io_devices:
-                self.io_devices[address] = data
-                self.io_writes += 1
-                return
-            raise MemoryError(f"Invalid I/O address: {hex(address)}")
-            
-        # Check address bounds
-        if not (0 <= address < self.MEMORY_SIZE - 3):
+        # A single range test admits RAM; everything else is I/O or an error
+        if not 0 <= address <= _LAST_WORD:
+            if address >= _IO_BASE:
+                slot = self._io_slot_of.get(address, -1)
+                if slot >= 0:
+                    self._io_values[slot] = data & 0xFFFFFFFF
+                    self.io_writes += 1
+                    return
+                raise MemoryError(f"Invalid I/O address: {hex(address)}")
             raise MemoryError(f"Memory write out of bounds: {hex(address)}")
-            
-        # Update cache
-        self.cache.write_word(address, data)
         
-        # Write to memory
-        data_bytes = data.to_bytes(4, byteorder='big')
-        self.memory[address:address + 4] = data_bytes
+        # Write to cache and memory
+        data &= 0xFFFFFFFF
+        self.cache._fill(address, data)
+        _pack(self.memory, address, data)
         self.writes += 1
     
+    # Word access has a single implementation under both names
+    read_word = read
+    write_word = write
+    
     def _read_io(self, address):
         """Read from I/O device."""
-        if address not in self.io_devices:
+        slot = self._io_slot_of.get(address, -1)
+        if slot < 0:
             raise MemoryError(f"Invalid I/O device address: {hex(address)}")
             
-        device = self.io_devices[address]
-        if device["type"] != "input":
+        if self._io_type[slot] != _IO_INPUT:
             raise MemoryError(f"Cannot read from output device at {hex(address)}")
             
         self.io_reads += 1
-        return device["value"]
+        return self._io_values[slot]
         
     def _write_io(self, address, value):
         """Write to I/O device."""
-        if address not in self.io_devices:
+        slot = self._io_slot_of.get(address, -1)
+        if slot < 0:
             raise MemoryError(f"Invalid I/O device address: {hex(address)}")
             
-        device = self.io_devices[address]
-        if device["type"] != "output":
+        if self._io_type[slot] != _IO_OUTPUT:
             raise MemoryError(f"Cannot write to input device at {hex(address)}")
             
         self.io_writes += 1
-        device["value"] = value
+        self._io_values[slot] = value & 0xFFFFFFFF
     
     def _find_io_device(self, address):
-        """Find the I/O device mapped to the given address."""
-        for start_addr, info in self.io_devices.items():
-            if start_addr <= address < start_addr + 4:
-                return info
+        """Find the I/O slot mapped to the given address."""
+        word = (address - self.IO_BASE) >> 2
+        if 0 <= word < len(self._io_lut):
+            slot = self._io_lut[word]
+            if slot >= 0:
+                return slot
         return None
     
     def _check_bounds(self, address: int) -> None:
         """Check if address is within memory bounds."""
         if address < 0 or address >= self.MEMORY_SIZE:
             # Check if this is an I/O device address
-            if address in self.io_devices:
+            if address in self._io_addr_set:
                 return
             # Stop execution immediately on first out-of-bounds access
             raise MemoryError(f"Memory access out of bounds at address {hex(address)}")
@@ -270,25 +398,33 @@ class MemoryBus:
     
     def clear(self):
         """Clear memory bus state."""
-        self.memory = bytearray(self.MEMORY_SIZE)
+        # Zero memory in place: no new 1MB allocation, and views stay valid
+        self.memory[:] = _ZERO_MEMORY
         self.cache.clear()
         self.reads = 0
         self.writes = 0
         self.io_reads = 0
         self.io_writes = 0
     
-    def dump_memory(self, start_addr, size):
+    def dump_memory(self, start_addr, size, *, copy=False):
         """
         Dump a section of memory for debugging.
         
         Args:
             start_addr: Starting address
             size: Number of bytes to dump
+            copy: Return an independent bytes copy instead of a view
             
         Returns:
-            Bytes object containing the memory contents
+            Read-only memoryview of the memory contents (no copy), or a
+            bytes object if copy is True
         """
         if start_addr + size > self.MEMORY_SIZE:
             raise MemoryBusError("Memory dump range out of bounds")
             
-        return bytes(self.memory[start_addr:start_addr + size])
+        view = memoryview(self.memory)[start_addr:start_addr + size].toreadonly()
+        return view.tobytes() if copy else view
+
+
+# Zero image used by MemoryBus.clear()
+_ZERO_MEMORY = bytes(MemoryBus.MEMORY_SIZE)
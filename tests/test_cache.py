@@ -0,0 +1,81 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from cache import Cache, CacheError
+from memory_bus import MemoryBus
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.memory_bus = MemoryBus()
+        for i in range(256):
+            self.memory_bus.write_word(i * 4, i)
+
+    def test_read_word(self):
+        """Test that cached reads return memory contents."""
+        cache = Cache(self.memory_bus)
+        for _ in range(2):
+            for i in range(256):
+                self.assertEqual(cache.read_word(i * 4), i)
+
+    def test_next_line_prefetch(self):
+        """Test that sequential reads miss less with prefetching enabled."""
+        plain = Cache(self.memory_bus, prefetch_enabled=False)
+        prefetching = Cache(self.memory_bus, prefetch_degree=2)
+        for i in range(64):
+            self.assertEqual(plain.read_word(i * 4), i)
+            self.assertEqual(prefetching.read_word(i * 4), i)
+        
+        self.assertEqual(plain.get_misses(), 8)  # One miss per 32-byte line
+        self.assertLess(prefetching.get_misses(), plain.get_misses())
+
+    def test_stride_prefetch(self):
+        """Test that constant-stride misses trigger prefetches that later hit."""
+        cache = Cache(self.memory_bus)
+        for i in range(0, 256, 64):
+            self.assertEqual(cache.read_word(i * 4), i)
+        
+        stats = cache.get_stats()
+        self.assertGreater(stats['prefetch_hits'], 0)
+        self.assertEqual(stats['hits'], stats['prefetch_hits'])
+
+    def test_write_through(self):
+        """Test that writes reach memory and update resident lines."""
+        cache = Cache(self.memory_bus)
+        cache.read_word(0x10)
+        cache.write_word(0x10, 0xDEADBEEF)
+        self.assertEqual(cache.read_word(0x10), 0xDEADBEEF)
+        self.assertEqual(self.memory_bus.read_word(0x10), 0xDEADBEEF)
+
+    def test_write_allocate(self):
+        """Test that a write miss allocates a coherent line."""
+        cache = Cache(self.memory_bus, prefetch_enabled=False)
+        cache.write_word(0x44, 0xCAFEBABE)
+        self.assertEqual(cache.get_misses(), 1)
+        self.assertEqual(cache.read_word(0x44), 0xCAFEBABE)
+        self.assertEqual(cache.read_word(0x40), 0x10)  # Rest of line from memory
+        self.assertEqual(cache.get_misses(), 1)
+
+    def test_invalidate_address(self):
+        """Test that invalidating an address only drops the line holding it."""
+        cache = Cache(self.memory_bus, prefetch_enabled=False)
+        cache.read_word(0x0)
+        cache.invalidate(0x400)  # Same index, different tag
+        cache.read_word(0x0)
+        self.assertEqual(cache.get_misses(), 1)
+        
+        cache.invalidate(0x0)
+        cache.read_word(0x0)
+        self.assertEqual(cache.get_misses(), 2)
+
+    def test_size_must_be_power_of_two(self):
+        """Test that sizes the index/tag shifts cannot split are rejected."""
+        with self.assertRaises(CacheError):
+            Cache(self.memory_bus, size=96)
+        cache = Cache(self.memory_bus, size=4096, prefetch_enabled=False)
+        self.assertEqual(cache.read_word(0x104), 0x104 // 4)
+        cache.read_word(0x1104)  # Same index, different tag
+        self.assertEqual(cache.get_misses(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
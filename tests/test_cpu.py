@@ -1,14 +1,114 @@
 import unittest
+import contextlib
+import io
+import os
+import tempfile
 from cpu import CPU
 from cache import Cache
+from instruction_parser import InstructionParser
 from memory_bus import MemoryBus
 
+INPUTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'inputs')
+
 class TestCPU(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # One 1MB bus and its instruction cache are shared by every test
+        cls.memory_bus = MemoryBus()
+        cls.cache = Cache(cls.memory_bus)
+    
     def setUp(self):
-        self.memory_bus = MemoryBus()
-        self.cache = Cache()
-        self.cpu = CPU(self.cache, self.memory_bus)
+        self.memory_bus.clear()
+        self.cache.flush()
+        self.cpu = CPU(self.memory_bus, icache=self.cache)
     
     def test_initialization(self):
         self.assertEqual(len(self.cpu.registers), 32)
         self.assertEqual(self.cpu.pc, 0)
+    
+    def run_program(self, path, memory_init=None):
+        """Assemble and load a program file, then run it to completion."""
+        parser = InstructionParser()
+        parser.parse_file(path)
+        self.memory_bus.load_program(parser.get_machine_code())
+        if memory_init:
+            self.memory_bus.load_memory(parser.parse_memory_init(memory_init))
+        
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.cpu.run()
+        self.assertTrue(self.cpu.halted)
+        self.assertNotIn("Error during execution", output.getvalue())
+    
+    def run_source(self, source):
+        """Run assembly source text as a program."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'prog.asm')
+            with open(path, 'w') as f:
+                f.write(source)
+            self.run_program(path)
+    
+    def test_sum_program(self):
+        """Test that test_program.asm stores the sum of its input words."""
+        self.run_program(os.path.join(INPUTS_DIR, 'test_program.asm'),
+                         os.path.join(INPUTS_DIR, 'memory_init.txt'))
+        self.assertEqual(self.memory_bus.read_word(0x200), 100)
+        self.assertEqual(self.cpu.registers[8], 100)  # $t0
+    
+    def test_branches(self):
+        """Test taken and not-taken BEQ and BNE."""
+        self.run_source(
+            "ADDI $t0, $zero, 5\n"
+            "ADDI $t1, $zero, 5\n"
+            "ADDI $t2, $zero, 7\n"
+            "BEQ $t0, $t1, a\n"      # Taken
+            "ADDI $s0, $zero, 1\n"
+            "a: BEQ $t0, $t2, b\n"   # Not taken
+            "ADDI $s1, $zero, 1\n"
+            "b: BNE $t0, $t2, c\n"   # Taken
+            "ADDI $s2, $zero, 1\n"
+            "c: BNE $t0, $t1, d\n"   # Not taken
+            "ADDI $s3, $zero, 1\n"
+            "d: HALT\n")
+        self.assertEqual(list(self.cpu.registers[16:20]), [0, 1, 0, 1])
+    
+    def test_jal_links_return_address(self):
+        """Test that JAL jumps and leaves the next instruction's address in $ra."""
+        self.run_source(
+            "JAL func\n"
+            "HALT\n"
+            "func: ADDI $t0, $zero, 1\n"
+            "HALT\n")
+        self.assertEqual(self.cpu.registers[31], 4)
+        self.assertEqual(self.cpu.registers[8], 1)
+        self.assertEqual(self.cpu.pc, 12)
+    
+    def test_zero_register_writes_ignored(self):
+        """Test that writes to $zero leave it zero."""
+        self.memory_bus.write_word(0x100, 42)
+        self.run_source(
+            "ADDI $t0, $zero, 3\n"
+            "ADDI $zero, $zero, 5\n"
+            "ADD $zero, $t0, $t0\n"
+            "SUB $zero, $zero, $t0\n"
+            "SLT $zero, $zero, $t0\n"
+            "LW $zero, 0x100($zero)\n"
+            "ADD $t1, $zero, $zero\n"
+            "HALT\n")
+        self.assertEqual(self.cpu.registers[0], 0)
+        self.assertEqual(self.cpu.registers[9], 0)
+    
+    def test_store_into_code(self):
+        """Test that a store over executed code is seen on the next fetch."""
+        # ADDI $t1, $t1, 16, stored over the loop's first instruction
+        self.memory_bus.write_word(0x100, 0x21290010)
+        self.run_source(
+            "ADDI $t2, $zero, 2\n"
+            "loop: ADDI $t1, $t1, 1\n"
+            "LW $t3, 0x100($zero)\n"
+            "SW $t3, 4($zero)\n"
+            "ADDI $t2, $t2, -1\n"
+            "BNE $t2, $zero, loop\n"
+            "HALT\n")
+        # First pass runs the original instruction, the second the patched one
+        self.assertEqual(self.cpu.registers[9], 17)
@@ -1,6 +1,8 @@
 import unittest
 import os
+import struct
 import sys
+import tempfile
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from instruction_parser import InstructionParser, InstructionParserError
 
@@ -11,12 +13,24 @@ class TestInstructionParser(unittest.TestCase):
         self.test_program = os.path.join(self.test_dir, 'test_program.asm')
         self.test_memory = os.path.join(self.test_dir, 'memory_init.txt')
 
+    def assemble(self, source):
+        """Assemble source text and return the machine code as a list of words."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'prog.asm')
+            with open(path, 'w') as f:
+                f.write(source)
+            self.parser.parse_file(path)
+        code = self.parser.get_machine_code()
+        return list(struct.unpack(f'>{len(code) // 4}I', code))
+
     def test_parse_instructions(self):
         """Test parsing of assembly instructions."""
-        instructions = self.parser.parse_instructions(self.test_program)
+        self.parser.parse_file(self.test_program)
+        code = self.parser.get_machine_code()
+        instructions = struct.unpack(f'>{len(code) // 4}I', code)
         
         # Verify we got the expected number of instructions
-        self.assertEqual(len(instructions), 9)  # 8 instructions + HALT
+        self.assertEqual(len(instructions), 10)  # 9 instructions + HALT
         
         # Verify first instruction (ADDI $t0, $zero, 0)
         self.assertEqual(instructions[0], 0x20080000)  # opcode=8, rt=8, rs=0, imm=0
@@ -27,6 +41,30 @@ class TestInstructionParser(unittest.TestCase):
         # Verify branch instruction (BNE $t2, $zero, loop)
         self.assertEqual(instructions[7] >> 26, 0x5)  # opcode=5 (BNE)
 
+    def test_forward_branch(self):
+        """Test that a branch to a later label gets a positive word offset."""
+        words = self.assemble("BEQ $t0, $t1, skip\nADDI $t0, $t0, 1\nskip: HALT\n")
+        self.assertEqual(words[0] >> 26, 0x4)  # opcode=4 (BEQ)
+        self.assertEqual(words[0] & 0xFFFF, 1)  # Skips one instruction past PC+4
+
+    def test_forward_jump(self):
+        """Test that a jump to a later label encodes its word address."""
+        words = self.assemble("J end\nADDI $t0, $t0, 1\nADDI $t0, $t0, 1\nend:\nHALT\n")
+        self.assertEqual(words[0], (0x2 << 26) | (0xC >> 2))  # opcode=2, target=0xC
+
+    def test_undefined_label(self):
+        """Test that references to undefined labels are rejected."""
+        with self.assertRaisesRegex(InstructionParserError, "Undefined label: nowhere"):
+            self.assemble("BNE $t0, $zero, nowhere\nHALT\n")
+        with self.assertRaisesRegex(InstructionParserError, "Undefined label: nowhere"):
+            self.assemble("J nowhere\nHALT\n")
+
+    def test_trailing_comma(self):
+        """Test that a trailing operand separator is ignored."""
+        words = self.assemble("ADD $t0, $t1, $t2,\nSW $t0, 4($sp) ,\nHALT\n")
+        self.assertEqual(words[:2], self.assemble("ADD $t0, $t1, $t2\nSW $t0, 4($sp)\nHALT\n")[:2])
+        self.assertEqual(words[0], 0x012A4020)  # rs=9, rt=10, rd=8, funct=0x20
+
     def test_parse_memory_init(self):
         """Test parsing of memory initialization file."""
         memory_data = self.parser.parse_memory_init(self.test_memory)
@@ -49,6 +87,14 @@ class TestInstructionParser(unittest.TestCase):
             self.parser._parse_register("invalid")
         with self.assertRaises(InstructionParserError):
             self.parser._parse_register("$32")  # Out of range
+        with self.assertRaises(InstructionParserError):
+            self.parser._parse_register("$099")
+
+    def test_numeric_register_spellings(self):
+        """Test that zero-padded register numbers resolve like the plain forms."""
+        self.assertEqual(self.parser._parse_register("$05"), 5)
+        self.assertEqual(self.parser._parse_register("$031"), 31)
+        self.assertEqual(self.parser._parse_register("$t0"), 8)
 
     def test_number_parsing(self):
         """Test parsing of numbers in different formats."""
@@ -0,0 +1,40 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import instruction_set
+from cpu import CPU, Decoded
+from memory_bus import MemoryBus
+
+# Register values around the 32-bit wrap and sign boundaries
+VALUES = [0, 1, 5, 0x7FFFFFFF, 0x80000000, 0xFFFFFFFF]
+
+class TestInstructionSet(unittest.TestCase):
+    def setUp(self):
+        self.cpu = CPU(MemoryBus())
+
+    def execute_r_type(self, funct, rs_value, rt_value):
+        """Run an R-type instruction on $t1, $t2 and return $t0."""
+        self.cpu.registers[9] = rs_value
+        self.cpu.registers[10] = rt_value
+        self.cpu.execute_instruction(Decoded(0x00, rs=9, rt=10, rd=8, shamt=0, funct=funct))
+        return self.cpu.registers[8]
+
+    def test_r_type_matches_cpu(self):
+        """Test ADD, SUB and SLT against the CPU executors."""
+        for a in VALUES:
+            for b in VALUES:
+                self.assertEqual(instruction_set.add(None, a, b), self.execute_r_type(0x20, a, b))
+                self.assertEqual(instruction_set.sub(None, a, b), self.execute_r_type(0x22, a, b))
+                self.assertEqual(instruction_set.slt(None, a, b), self.execute_r_type(0x2A, a, b))
+
+    def test_addi_matches_cpu(self):
+        """Test ADDI with sign-extended immediates against the CPU executor."""
+        for a in VALUES:
+            for immediate in (-32768, -1, 1, 32767):
+                self.cpu.registers[9] = a
+                self.cpu.execute_instruction(Decoded(0x08, rs=9, rt=8, immediate=immediate))
+                self.assertEqual(instruction_set.addi(None, a, immediate), self.cpu.registers[8])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from memory_bus import MemoryBus
+
+class TestMemoryBus(unittest.TestCase):
+    def setUp(self):
+        self.memory_bus = MemoryBus()
+
+    def test_word_round_trip(self):
+        """Test that written words read back big-endian and masked to 32 bits."""
+        self.memory_bus.write_word(0x100, 0x01020304)
+        self.memory_bus.write_word(0x104, -1)
+        self.assertEqual(self.memory_bus.read_word(0x100), 0x01020304)
+        self.assertEqual(self.memory_bus.read_word(0x104), 0xFFFFFFFF)
+        self.assertEqual(bytes(self.memory_bus.dump_memory(0x100, 4)), b'\x01\x02\x03\x04')
+
+    def test_read_write_words(self):
+        """Test batch word access against single-word access."""
+        self.memory_bus.write_words(0x200, [1, 2, 3, 0x80000000])
+        self.assertEqual(list(self.memory_bus.read_words(0x200, 4)), [1, 2, 3, 0x80000000])
+        self.assertEqual(self.memory_bus.read_word(0x20C), 0x80000000)
+        with self.assertRaises(MemoryError):
+            self.memory_bus.read_words(MemoryBus.MEMORY_SIZE - 4, 2)
+
+    def test_io_devices(self):
+        """Test I/O values set on the bus are returned by reads."""
+        self.memory_bus.set_io_value(MemoryBus.IO_BASE, 25)
+        self.assertEqual(self.memory_bus.read_word(MemoryBus.IO_BASE), 25)
+        self.memory_bus.write_word(MemoryBus.IO_BASE + 4, 7)
+        self.assertEqual(self.memory_bus.io_devices[MemoryBus.IO_BASE + 4], 7)
+        with self.assertRaises(TypeError):
+            self.memory_bus.io_devices[MemoryBus.IO_BASE] = 1
+        with self.assertRaises(MemoryError):
+            self.memory_bus.read_word(MemoryBus.IO_BASE + 0x100)
+
+    def test_builtin_io_device_types(self):
+        """Test the built-in devices are typed as input and output."""
+        self.assertEqual(self.memory_bus._read_io(MemoryBus.IO_BASE), 8)
+        self.memory_bus._write_io(MemoryBus.IO_BASE + 4, 3)
+        self.assertEqual(self.memory_bus.io_devices[MemoryBus.IO_BASE + 4], 3)
+        with self.assertRaises(MemoryError):
+            self.memory_bus._write_io(MemoryBus.IO_BASE, 1)
+        with self.assertRaises(MemoryError):
+            self.memory_bus._read_io(MemoryBus.IO_BASE + 4)
+
+    def test_load_memory(self):
+        """Test that memory init data loads and reads back."""
+        self.memory_bus.load_memory({0x100: 10, 0x104: 20, 0x200: -1, 0x300: b'\x00\x00\x00\x05'})
+        self.assertEqual(self.memory_bus.read_word(0x100), 10)
+        self.assertEqual(self.memory_bus.read_word(0x104), 20)
+        self.assertEqual(self.memory_bus.read_word(0x200), 0xFFFFFFFF)
+        self.assertEqual(self.memory_bus.read_word(0x300), 5)
+
+    def test_load_memory_invalidates_cache(self):
+        """Test that words loaded after a read are not served stale from the cache."""
+        self.memory_bus.read_word(0x2FC)  # Prefetches 0x300
+        self.memory_bus.load_memory({0x300: 7})
+        self.assertEqual(self.memory_bus.read_word(0x300), 7)
+
+if __name__ == '__main__':
+    unittest.main()